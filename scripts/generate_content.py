@@ -2,6 +2,10 @@
 """
 Script de génération de contenu massif pour AI English Trainer
 Génère: dictionnaire 4000 mots, 200 QCM, 200 textes à trous, etc.
+
+Les releases versionnées ne sont pas publiées ici : lancer les scripts de
+post-traitement (fillListeningReadingOptions.js, completeListeningReadingPlaceholders.js)
+puis publish_corpus_releases.py, qui versionne les fichiers réellement servis.
 """
 
 import json
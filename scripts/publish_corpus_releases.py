@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Publication des releases versionnées du corpus pour AI English Trainer
+
+À lancer après generate_content.py et les scripts de post-traitement
+(fillExercisePlaceholders.js, fillListeningReadingOptions.js,
+completeListeningReadingPlaceholders.js) :
+les releases sont calculées à partir des fichiers JSON réellement servis.
+
+Pour chaque corpus, public/corpus/releases/<corpus>/ contient :
+  - manifest.json : dernière version + historique (point de validation final)
+  - index_vN.json : empreinte de chaque élément de la release N (id -> hash, dans l'ordre du fichier)
+  - patch_vN-1_vN.json : éléments ajoutés / modifiés et ids supprimés
+
+Application d'un patch (voir apply_patch) : retirer "removed", remplacer "changed"
+sur place, puis insérer chaque entrée de "added" juste après l'id "after" (null =
+en tête), dans l'ordre du patch. Si les éléments conservés ont été réordonnés, le
+patch porte "order" (liste complète des ids) et la liste est reconstruite dans cet ordre.
+Le numéro de release est inscrit à la racine du fichier servi ("release").
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+# Chemins
+BASE_DIR = Path(__file__).parent.parent
+PUBLIC_DIR = BASE_DIR / "public" / "corpus"
+# Exercices servis par l'app (/data/exercises/...), pas la copie de src/data
+EXERCISES_DIR = PUBLIC_DIR.parent / "data" / "exercises"
+RELEASES_DIR = PUBLIC_DIR / "releases"
+
+# Corpus publiés : fichier servi, clé de la liste d'éléments et listes miroirs.
+# Un miroir contient, pour chaque élément "<replaces>NNNN", une copie identique
+# d'id "<id_prefix>NNNN" ; les clients appliquent le patch aux deux listes.
+CORPORA = {
+    "dictionary": {
+        "path": PUBLIC_DIR / "dictionaries" / "full_dictionary_4000.json",
+        "items": "entries_en_fr",
+        "mirrors": {"entries_fr_en": {"id_prefix": "dict_fr_", "replaces": "dict_"}}
+    },
+    "qcm": {"path": EXERCISES_DIR / "all_qcm_200.json", "items": "exercises"},
+    "cloze": {"path": EXERCISES_DIR / "all_cloze_200.json", "items": "exercises"},
+    "listening": {"path": PUBLIC_DIR / "listening" / "all_listening_100.json", "items": "texts"},
+    "reading": {"path": PUBLIC_DIR / "reading" / "all_reading_100.json", "items": "texts"}
+}
+
+def item_hash(item):
+    """Empreinte stable d'un élément (JSON canonique, indépendant de l'ordre des clés)"""
+    canonical = json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+def mirror_id(item_id, mirror):
+    """Id de la copie miroir d'un élément"""
+    return mirror["id_prefix"] + item_id[len(mirror["replaces"]):]
+
+def write_text_atomic(path, text):
+    """Écrit un fichier via un fichier temporaire + os.replace (jamais de fichier à moitié écrit)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    if path.exists():
+        shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+
+def write_json_atomic(path, data, compact=False):
+    """Écrit un JSON de release de façon atomique"""
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    write_text_atomic(path, text)
+
+def read_release(data):
+    """Numéro de release inscrit dans un fichier de corpus (None si absent)"""
+    return data.get("release")
+
+def stamp_release(text, version):
+    """Inscrit le numéro de release à la racine du JSON en conservant sa mise en forme.
+
+    Seule la dernière clé de l'objet racine est ajoutée ou modifiée : le reste du
+    fichier (mise en page Prettier, fin de ligne) est laissé intact.
+    """
+    existing = re.search(r'("release"\s*:\s*)\d+(\s*\}\s*)$', text)
+    if existing:
+        stamped = text[:existing.start()] + f"{existing.group(1)}{version}{existing.group(2)}"
+    else:
+        indent = re.match(r'\{\s*?\n([ \t]*)"', text)
+        indent = indent.group(1) if indent else "  "
+        end = re.search(r'(\S)(\s*\}\s*)$', text)
+        stamped = text[:end.start()] + f'{end.group(1)},\n{indent}"release": {version}{end.group(2)}'
+    if read_release(json.loads(stamped)) != version:
+        raise ValueError(f"Impossible d'inscrire la release {version} à la racine du fichier")
+    return stamped
+
+def apply_patch(items, patch, mirror=None):
+    """Applique un patch à la liste d'éléments d'une release (implémentation de référence client).
+
+    Avec mirror, le patch est appliqué à la liste miroir correspondante (ex. entries_fr_en).
+    """
+    def to_id(item_id):
+        return mirror_id(item_id, mirror) if mirror and item_id is not None else item_id
+
+    def to_item(item):
+        return dict(item, id=to_id(item["id"])) if mirror else item
+
+    removed = {to_id(item_id) for item_id in patch["removed"]}
+    changed = {to_id(item["id"]): to_item(item) for item in patch["changed"]}
+    kept = [changed.get(item["id"], item) for item in items if item["id"] not in removed]
+    added = [(to_id(entry["after"]), to_item(entry["item"])) for entry in patch["added"]]
+
+    if patch.get("order"):
+        by_id = {item["id"]: item for item in kept}
+        by_id.update((item["id"], item) for _, item in added)
+        return [by_id[to_id(item_id)] for item_id in patch["order"]]
+
+    followers = {}
+    for after, item in added:
+        followers.setdefault(after, []).append(item)
+    # Parcours itératif : chaque élément est suivi de la chaîne d'éléments ajoutés après lui
+    result = []
+    stack = list(reversed(kept))
+    stack.extend(reversed(followers.pop(None, [])))
+    while stack:
+        item = stack.pop()
+        result.append(item)
+        stack.extend(reversed(followers.pop(item["id"], [])))
+    return result
+
+def check_mirrors(corpus, data, items, mirrors):
+    """Vérifie que chaque liste miroir est exactement la copie des éléments indexés"""
+    for key, mirror in mirrors.items():
+        expected = {}
+        for item in items:
+            copy = dict(item)
+            copy["id"] = mirror_id(item["id"], mirror)
+            expected[copy["id"]] = copy
+        for entry in data.get(key, []):
+            if expected.pop(entry.get("id"), None) != entry:
+                raise ValueError(f"{corpus}: {key} ne reflète pas les éléments (id {entry.get('id')})")
+        if expected:
+            raise ValueError(f"{corpus}: {key} incomplet ({len(expected)} copies manquantes)")
+
+def publish_release(corpus, corpus_path, items_key, mirrors=None):
+    """Publie une release du corpus à partir du fichier servi et le patch depuis la précédente.
+
+    Le diff parcourt les éléments une seule fois en consommant l'index de la
+    release précédente : il reste linéaire en taille de corpus. Ordre d'écriture
+    (atomique) : patch, index, fichier de corpus, puis manifest en dernier ; une
+    exécution interrompue avant le manifest est simplement rejouée au passage suivant.
+    Si rien n'a changé, la version courante est conservée.
+    Retourne le numéro de release du corpus.
+    """
+    release_dir = RELEASES_DIR / corpus
+    manifest_path = release_dir / "manifest.json"
+
+    with open(corpus_path, encoding='utf-8') as f:
+        text = f.read()
+    data = json.loads(text)
+    items = data[items_key]
+    mirrors = mirrors or {}
+
+    if manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    elif read_release(data) is not None:
+        raise RuntimeError(
+            f"{corpus}: {corpus_path.name} porte la release {read_release(data)} "
+            f"mais {manifest_path} est absent (état des releases manquant)"
+        )
+    else:
+        manifest = {"corpus": corpus, "latest": 0, "releases": []}
+        if mirrors:
+            manifest["mirrors"] = mirrors
+
+    latest = manifest["latest"]
+    previous_index = {}
+    if latest:
+        index_path = release_dir / f"index_v{latest}.json"
+        if not index_path.exists():
+            raise RuntimeError(f"{corpus}: index de la release v{latest} introuvable ({index_path})")
+        with open(index_path, encoding='utf-8') as f:
+            previous_index = json.load(f)
+
+    check_mirrors(corpus, data, items, mirrors)
+
+    # L'index précédent est dans l'ordre du fichier : rang de chaque id conservé
+    previous_rank = {item_id: rank for rank, item_id in enumerate(previous_index)}
+    index = {}
+    added, changed = [], []
+    after = None
+    reordered = False
+    last_rank = -1
+    for item in items:
+        item_id = item["id"]
+        if item_id in index:
+            raise ValueError(f"Identifiant dupliqué dans {corpus}: {item_id}")
+        digest = item_hash(item)
+        index[item_id] = digest
+        previous = previous_index.pop(item_id, None)
+        if previous is None:
+            added.append({"after": after, "item": item})
+        else:
+            if previous != digest:
+                changed.append(item)
+            reordered = reordered or previous_rank[item_id] < last_rank
+            last_rank = previous_rank[item_id]
+        after = item_id
+    removed = sorted(previous_index)
+
+    if latest and not (added or changed or removed or reordered):
+        if read_release(data) != latest:
+            write_text_atomic(corpus_path, stamp_release(text, latest))
+        print(f"   ↳ {corpus}: release v{latest} inchangée")
+        return latest
+
+    version = latest + 1
+    release_dir.mkdir(parents=True, exist_ok=True)
+    release = {"version": version, "total": len(index)}
+    if latest:
+        patch_name = f"patch_v{latest}_v{version}.json"
+        patch = {
+            "corpus": corpus,
+            "from": latest,
+            "to": version,
+            "added": added,
+            "changed": changed,
+            "removed": removed
+        }
+        if reordered:
+            patch["order"] = list(index)
+        if mirrors:
+            patch["mirrors"] = mirrors
+        write_json_atomic(release_dir / patch_name, patch, compact=True)
+        release.update({
+            "patch": patch_name,
+            "added": len(added),
+            "changed": len(changed),
+            "removed": len(removed)
+        })
+
+    write_json_atomic(release_dir / f"index_v{version}.json", index, compact=True)
+    write_text_atomic(corpus_path, stamp_release(text, version))
+
+    manifest["latest"] = version
+    manifest["releases"].append(release)
+    write_json_atomic(manifest_path, manifest)
+
+    # Seul l'index de la dernière release sert au diff suivant
+    if latest:
+        (release_dir / f"index_v{latest}.json").unlink(missing_ok=True)
+
+    print(f"   ↳ {corpus}: release v{version} (+{len(added)} ~{len(changed)} -{len(removed)})")
+    return version
+
+if __name__ == "__main__":
+    print("📦 Publication des releases du corpus...\n")
+
+    try:
+        names = sys.argv[1:] or list(CORPORA)
+        for name in names:
+            config = CORPORA[name]
+            publish_release(name, config["path"], config["items"], config.get("mirrors"))
+
+        print("\n✅ RELEASES PUBLIÉES AVEC SUCCÈS !")
+
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+        raise
@@ -0,0 +1,213 @@
+"""
+Tests de publish_corpus_releases.py (releases versionnées + patchs delta)
+Lancer: python -m pytest scripts/tests -q
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import publish_corpus_releases as releases  # noqa: E402
+
+MIRRORS = {"entries_fr_en": {"id_prefix": "dict_fr_", "replaces": "dict_"}}
+
+@pytest.fixture
+def releases_dir(tmp_path, monkeypatch):
+    path = tmp_path / "releases"
+    monkeypatch.setattr(releases, "RELEASES_DIR", path)
+    return path
+
+def write_corpus(path, items, **extra):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"exercises": items, "total": len(items), **extra}, f)
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def qcm(i, text="question"):
+    return {"id": f"qcm_{i:03d}", "text": text}
+
+def test_first_release_stamps_file_without_patch(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    write_corpus(corpus_path, [qcm(1), qcm(2)])
+
+    assert releases.publish_release("qcm", corpus_path, "exercises") == 1
+
+    manifest = read_json(releases_dir / "qcm" / "manifest.json")
+    assert manifest["latest"] == 1
+    assert manifest["releases"] == [{"version": 1, "total": 2}]
+    assert read_json(corpus_path)["release"] == 1
+    assert not list((releases_dir / "qcm").glob("patch_*.json"))
+
+def test_unchanged_run_keeps_version(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    write_corpus(corpus_path, [qcm(1), qcm(2)])
+    releases.publish_release("qcm", corpus_path, "exercises")
+
+    # Fichier régénéré sans numéro de release : la version est réinscrite, pas incrémentée
+    write_corpus(corpus_path, [qcm(1), qcm(2)])
+    assert releases.publish_release("qcm", corpus_path, "exercises") == 1
+    assert read_json(corpus_path)["release"] == 1
+    assert len(read_json(releases_dir / "qcm" / "manifest.json")["releases"]) == 1
+
+def test_patch_lists_added_changed_and_removed(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    write_corpus(corpus_path, [qcm(1), qcm(2), qcm(3)])
+    releases.publish_release("qcm", corpus_path, "exercises")
+
+    write_corpus(corpus_path, [qcm(1), qcm(3, "edited"), qcm(4)], release=1)
+    assert releases.publish_release("qcm", corpus_path, "exercises") == 2
+
+    release_dir = releases_dir / "qcm"
+    patch = read_json(release_dir / "patch_v1_v2.json")
+    assert patch["added"] == [{"after": "qcm_003", "item": qcm(4)}]
+    assert patch["changed"] == [qcm(3, "edited")]
+    assert patch["removed"] == ["qcm_002"]
+    assert read_json(release_dir / "manifest.json")["releases"][-1] == {
+        "version": 2, "total": 3, "patch": "patch_v1_v2.json",
+        "added": 1, "changed": 1, "removed": 1
+    }
+    assert read_json(corpus_path)["release"] == 2
+    assert not (release_dir / "index_v1.json").exists()
+
+def test_duplicate_id_raises(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    write_corpus(corpus_path, [qcm(1), qcm(1, "other")])
+
+    with pytest.raises(ValueError, match="qcm_001"):
+        releases.publish_release("qcm", corpus_path, "exercises")
+    assert not (releases_dir / "qcm" / "manifest.json").exists()
+
+def test_stamped_file_without_manifest_raises(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    write_corpus(corpus_path, [qcm(1)], release=3)
+
+    with pytest.raises(RuntimeError, match="manifest"):
+        releases.publish_release("qcm", corpus_path, "exercises")
+
+def test_interrupted_run_before_manifest_is_replayed(tmp_path, releases_dir, monkeypatch):
+    corpus_path = tmp_path / "qcm.json"
+    write_corpus(corpus_path, [qcm(1)])
+    releases.publish_release("qcm", corpus_path, "exercises")
+
+    # Simule un arrêt juste avant l'écriture du manifest de la release 2
+    write_corpus(corpus_path, [qcm(1, "edited")], release=1)
+    original = releases.write_json_atomic
+
+    def fail_on_manifest(path, data, compact=False):
+        if path.name == "manifest.json":
+            raise OSError("disk full")
+        original(path, data, compact)
+
+    monkeypatch.setattr(releases, "write_json_atomic", fail_on_manifest)
+    with pytest.raises(OSError):
+        releases.publish_release("qcm", corpus_path, "exercises")
+    monkeypatch.setattr(releases, "write_json_atomic", original)
+
+    assert releases.publish_release("qcm", corpus_path, "exercises") == 2
+    patch = read_json(releases_dir / "qcm" / "patch_v1_v2.json")
+    assert patch["changed"] == [qcm(1, "edited")]
+
+def test_dictionary_mirrors_are_declared_and_checked(tmp_path, releases_dir):
+    entry = {"id": "dict_0001", "en": "term", "fr": "terme"}
+    data = {
+        "metadata": {"version": "1.0.0"},
+        "entries_en_fr": [entry],
+        "entries_fr_en": [dict(entry, id="dict_fr_0001")]
+    }
+    corpus_path = tmp_path / "dictionary.json"
+    with open(corpus_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    releases.publish_release("dictionary", corpus_path, "entries_en_fr", MIRRORS)
+
+    manifest = read_json(releases_dir / "dictionary" / "manifest.json")
+    assert manifest["mirrors"] == MIRRORS
+    assert read_json(corpus_path)["release"] == 1
+
+    data = read_json(corpus_path)
+    data["entries_en_fr"][0]["fr"] = "nouveau terme"
+    with open(corpus_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    with pytest.raises(ValueError, match="entries_fr_en"):
+        releases.publish_release("dictionary", corpus_path, "entries_en_fr", MIRRORS)
+
+    data["entries_fr_en"][0]["fr"] = "nouveau terme"
+    with open(corpus_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    assert releases.publish_release("dictionary", corpus_path, "entries_en_fr", MIRRORS) == 2
+    patch = read_json(releases_dir / "dictionary" / "patch_v1_v2.json")
+    assert patch["mirrors"] == MIRRORS
+
+def test_applying_patch_reproduces_new_release(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    old_items = [qcm(1), qcm(2), qcm(3), qcm(4)]
+    write_corpus(corpus_path, old_items)
+    releases.publish_release("qcm", corpus_path, "exercises")
+
+    new_items = [qcm(5), qcm(6), qcm(1, "edited"), qcm(7), qcm(3), qcm(8), qcm(9)]
+    write_corpus(corpus_path, new_items, release=1)
+    releases.publish_release("qcm", corpus_path, "exercises")
+
+    patch = read_json(releases_dir / "qcm" / "patch_v1_v2.json")
+    assert "order" not in patch
+    assert releases.apply_patch(old_items, patch) == read_json(corpus_path)["exercises"]
+
+def test_reordered_items_ship_full_order(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    old_items = [qcm(1), qcm(2), qcm(3)]
+    write_corpus(corpus_path, old_items)
+    releases.publish_release("qcm", corpus_path, "exercises")
+
+    write_corpus(corpus_path, [qcm(3), qcm(4), qcm(1)], release=1)
+    assert releases.publish_release("qcm", corpus_path, "exercises") == 2
+
+    patch = read_json(releases_dir / "qcm" / "patch_v1_v2.json")
+    assert patch["order"] == ["qcm_003", "qcm_004", "qcm_001"]
+    assert releases.apply_patch(old_items, patch) == read_json(corpus_path)["exercises"]
+
+def test_mirror_patch_reproduces_mirror_list(tmp_path, releases_dir):
+    def entry(i, fr="terme"):
+        return {"id": f"dict_{i:04d}", "fr": fr}
+
+    def dictionary(entries):
+        return {
+            "metadata": {"version": "1.0.0"},
+            "entries_en_fr": entries,
+            "entries_fr_en": [dict(e, id=e["id"].replace("dict_", "dict_fr_")) for e in entries]
+        }
+
+    corpus_path = tmp_path / "dictionary.json"
+    old = dictionary([entry(1), entry(2), entry(3)])
+    with open(corpus_path, 'w', encoding='utf-8') as f:
+        json.dump(old, f)
+    releases.publish_release("dictionary", corpus_path, "entries_en_fr", MIRRORS)
+
+    with open(corpus_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(dictionary([entry(1, "modifié"), entry(3), entry(4)]), release=1), f)
+    releases.publish_release("dictionary", corpus_path, "entries_en_fr", MIRRORS)
+
+    patch = read_json(releases_dir / "dictionary" / "patch_v1_v2.json")
+    served = read_json(corpus_path)
+    mirror = patch["mirrors"]["entries_fr_en"]
+    assert releases.apply_patch(old["entries_en_fr"], patch) == served["entries_en_fr"]
+    assert releases.apply_patch(old["entries_fr_en"], patch, mirror) == served["entries_fr_en"]
+
+def test_stamp_keeps_existing_formatting(tmp_path, releases_dir):
+    corpus_path = tmp_path / "qcm.json"
+    text = '{\n  "exercises": [\n    { "id": "qcm_001", "tags": ["a", "b"] }\n  ],\n  "total": 1\n}\n'
+    corpus_path.write_text(text, encoding='utf-8')
+
+    releases.publish_release("qcm", corpus_path, "exercises")
+    stamped = corpus_path.read_text(encoding='utf-8')
+    assert stamped == text.replace('"total": 1\n', '"total": 1,\n  "release": 1\n')
+
+    corpus_path.write_text(stamped.replace('"a"', '"c"'), encoding='utf-8')
+    releases.publish_release("qcm", corpus_path, "exercises")
+    assert corpus_path.read_text(encoding='utf-8') == text.replace('"a"', '"c"').replace(
+        '"total": 1\n', '"total": 1,\n  "release": 2\n'
+    )